@@ -0,0 +1,144 @@
+"""Generate synthetic sperm cell sample data for pipeline testing.
+
+Creates a 'Sperm 1' folder with binary TIFF stacks for each organelle
+(sperm cell body, nucleus, pseudopod, mitochondria) plus a matching
+tracking CSV, following the naming conventions in docs/FILE_NAMING_GUIDE.md.
+
+Useful for testing the pipeline end-to-end without real microscopy data.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+import tifffile
+
+# Numba is optional - when present the mitochondria stamping loop runs as
+# parallel machine code; otherwise the NumPy stencil path below is used
+try:
+    from numba import njit, prange
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+
+if _HAVE_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _stamp_spheres(volume, points, radius):
+        """Stamp a filled sphere of 255s at every (z, y, x) point."""
+        for i in prange(points.shape[0]):
+            z, y, x = points[i, 0], points[i, 1], points[i, 2]
+            for dz in range(-radius, radius + 1):
+                for dy in range(-radius, radius + 1):
+                    for dx in range(-radius, radius + 1):
+                        if dz * dz + dy * dy + dx * dx <= radius * radius:
+                            zi, yi, xi = z + dz, y + dy, x + dx
+                            if (0 <= zi < volume.shape[0] and
+                                    0 <= yi < volume.shape[1] and
+                                    0 <= xi < volume.shape[2]):
+                                volume[zi, yi, xi] = 255
+
+
+def create_sample_sperm_data(output_dir: str, sperm_id: int = 1) -> str:
+    """Create synthetic organelle stacks and tracking CSV for one sperm cell.
+
+    Generates a small (20x64x64) volume containing:
+    - Sperm cell body: ellipsoid elongated along Y/X
+    - Nucleus: sphere near the cell center
+    - Pseudopod: slanted slab extending from the cell body
+    - Mitochondria: small spheres placed along tracked trajectories
+
+    Args:
+        output_dir: Parent directory in which to create the 'Sperm N' folder.
+        sperm_id: Sperm cell ID used in folder and file names.
+
+    Returns:
+        Path to the created 'Sperm N' folder.
+    """
+    folder = os.path.join(output_dir, f"Sperm {sperm_id}")
+    os.makedirs(folder, exist_ok=True)
+
+    z_size, y_size, x_size = 20, 64, 64
+
+    # All four channels live in one contiguous (4,Z,Y,X) buffer; the per-
+    # organelle names below are views into it, so one allocation serves the
+    # whole volume and downstream all-channel passes stay cache-friendly
+    stacks = np.zeros((4, z_size, y_size, x_size), dtype=np.uint8)
+    sperm_stack, nucleus_stack, pseudopod_stack, mito_stack = stacks
+
+    # --- Sperm cell body: ellipsoid via broadcast distance field ---
+    # np.ogrid gives (Z,1,1), (1,Y,1), (1,1,X) vectors that broadcast to the
+    # full volume without materializing 3D coordinate arrays
+    zc, yc, xc = np.ogrid[:z_size, :y_size, :x_size]
+    zn = (zc - z_size / 2) / (z_size / 2)
+    yn = (yc - y_size / 2) / (y_size / 4)
+    xn = (xc - x_size / 2) / (x_size / 4)
+    sperm_stack[zn * zn + yn * yn + xn * xn < 1.0] = 255
+
+    # --- Nucleus: sphere near the cell center, same broadcast pattern ---
+    nz = (zc - z_size / 2) / 4.0
+    ny = (yc - y_size / 2) / 6.0
+    nx = (xc - x_size / 2 + 8) / 6.0
+    nucleus_stack[nz * nz + ny * ny + nx * nx < 1.0] = 255
+
+    # --- Pseudopod: slanted slab extending from the cell body ---
+    pod_y = 15 + zc * 0.5  # slab drifts in Y with depth; broadcasts over (Z,1,1)
+    pseudopod_stack[(np.abs(yc - pod_y) < 3) & (np.abs(xc - 48) < 8)] = 255
+
+    # --- Mitochondria: small spheres along tracked trajectories ---
+    mito_radius = 2
+    mito_positions = [
+        [(z, 20 + z, 20 + z // 2) for z in range(4, 16)],  # track 1: drifts down-right
+        [(z, 40, 30 + z) for z in range(6, 18)],           # track 2: drifts right
+        [(z, 30 - z // 2, 40) for z in range(2, 14)],      # track 3: drifts up
+    ]
+    points = np.array([p for trajectory in mito_positions for p in trajectory],
+                      dtype=np.int32)
+    if _HAVE_NUMBA:
+        _stamp_spheres(mito_stack, points, mito_radius)
+    else:
+        # Precompute the sphere stencil once: (K,3) array of in-sphere offsets
+        r = mito_radius
+        dz, dy, dx = np.mgrid[-r:r + 1, -r:r + 1, -r:r + 1]
+        in_sphere = dz * dz + dy * dy + dx * dx <= r * r
+        offsets = np.stack([dz[in_sphere], dy[in_sphere], dx[in_sphere]], axis=1)
+        for (z, y, x) in points:
+            pts = offsets + (z, y, x)
+            inside = ((pts >= 0) & (pts < (z_size, y_size, x_size))).all(axis=1)
+            pts = pts[inside]
+            mito_stack[pts[:, 0], pts[:, 1], pts[:, 2]] = 255
+
+    # --- Tracking CSV: one row per tracked point (Frame is 1-indexed) ---
+    # Build from preallocated column arrays rather than appending row dicts
+    n_points = sum(len(t) for t in mito_positions)
+    frames = np.empty(n_points, dtype=np.int32)
+    xs = np.empty(n_points, dtype=np.int32)
+    ys = np.empty(n_points, dtype=np.int32)
+    tracks = np.empty(n_points, dtype=np.int32)
+    offset = 0
+    for track_id, trajectory in enumerate(mito_positions, start=1):
+        k = len(trajectory)
+        traj_z, traj_y, traj_x = zip(*trajectory)
+        frames[offset:offset + k] = np.asarray(traj_z) + 1  # Frame is 1-indexed Z-slice
+        xs[offset:offset + k] = traj_x
+        ys[offset:offset + k] = traj_y
+        tracks[offset:offset + k] = track_id
+        offset += k
+    tracking_df = pd.DataFrame({"Frame": frames, "X": xs, "Y": ys, "Track": tracks})
+
+    # --- Save everything with pipeline naming conventions ---
+    # tifffile writes raw strips directly, skipping skimage plugin dispatch
+    tifffile.imwrite(os.path.join(folder, f"sperm_cell_stack_{sperm_id}.tif"), sperm_stack, compression=None)
+    tifffile.imwrite(os.path.join(folder, f"nucleus_stack_{sperm_id}.tif"), nucleus_stack, compression=None)
+    tifffile.imwrite(os.path.join(folder, f"pseudopod_stack_{sperm_id}.tif"), pseudopod_stack, compression=None)
+    tifffile.imwrite(os.path.join(folder, f"mitochondria_stack_{sperm_id}.tif"), mito_stack, compression=None)
+    # Feather (Arrow IPC) is much faster to write and reload than CSV, but
+    # the discovery helpers (find_input_csv, find_csv_by_pattern) only look
+    # for *.csv - keep a CSV twin so the pipeline can find the tracking data
+    tracking_df.to_feather(os.path.join(folder, f"mito_tracking_{sperm_id}.feather"))
+    tracking_df.to_csv(os.path.join(folder, f"mito_tracking_{sperm_id}.csv"), index=False)
+
+    print(f"Sample data created in: {folder}")
+    return folder
+
+
+if __name__ == "__main__":
+    create_sample_sperm_data("sample_data")
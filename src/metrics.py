@@ -5,16 +5,41 @@ including volume, surface area, sphericity, centroid location, and distances
 to reference structures (pseudopod, nucleus).
 """
 
+import functools
 import numpy as np
 import os
 import pandas as pd
 import math
-from skimage import io, measure, segmentation
+import tifffile
+from skimage import measure, segmentation
 from scipy import ndimage as ndi
 from skimage.measure import marching_cubes, mesh_surface_area
-from sklearn.decomposition import PCA
 from .config import PIXEL_SIZE_UM, SLICE_THICKNESS_UM, VOXEL_VOLUME, ORGANELLE_THRESHOLD
 
+# Optional GPU path for the watershed distance transform. cupy/cucim are not
+# required dependencies - without them (or without a CUDA device) the
+# scipy/skimage CPU path below is used.
+try:
+    import cupy as cp
+    from cupyx.scipy import ndimage as cundi
+    from cucim.skimage import segmentation as cuseg
+    _USE_GPU = cp.cuda.runtime.getDeviceCount() > 0
+except Exception:
+    _USE_GPU = False
+
+@functools.lru_cache(maxsize=32)
+def _load_mask(path: str, mtime: float, threshold: int) -> np.ndarray:
+    """Read a TIFF and binarize it, cached on (path, mtime, threshold).
+
+    The same nucleus/pseudopod stack is read several times across a pipeline
+    run; caching skips the repeated TIFF decode. The mtime key invalidates
+    stale entries when a file is rewritten. The returned array is marked
+    read-only because it is shared between callers - copy before mutating.
+    """
+    mask = (tifffile.imread(path) > threshold).view(np.uint8)
+    mask.flags.writeable = False
+    return mask
+
 def get_centroid(path: str) -> np.ndarray:
     """Extract centroid of largest connected component in a binary mask.
     
@@ -25,10 +50,16 @@ def get_centroid(path: str) -> np.ndarray:
         Centroid coordinates as (z, y, x) numpy array.
         Returns array of NaNs if no objects found.
     """
-    mask = io.imread(path)
-    mask = (mask > 0).astype(np.uint8)
-    props = measure.regionprops(measure.label(mask))
-    return np.array(props[0].centroid) if props else np.array([np.nan] * 3)
+    mask = _load_mask(path, os.path.getmtime(path), 0)
+    # Label sizes via bincount + a single center_of_mass call - avoids
+    # regionprops building a Python proxy object (and eager moments) per label
+    labeled, num = ndi.label(mask, structure=np.ones((3, 3, 3)))  # full connectivity, as measure.label used
+    if num == 0:
+        return np.array([np.nan] * 3)
+    sizes = np.bincount(labeled.ravel())
+    sizes[0] = 0  # background
+    largest = int(sizes.argmax())
+    return np.array(ndi.center_of_mass(mask, labeled, largest))
 
 def compute_direction_vector(binary_mask: np.ndarray, voxel_spacing: tuple = None) -> np.ndarray:
     """Compute principal direction vector using PCA.
@@ -44,13 +75,39 @@ def compute_direction_vector(binary_mask: np.ndarray, voxel_spacing: tuple = Non
     """
     if voxel_spacing is None:
         voxel_spacing = (1.0, 1.0, 1.0)
-    coords = np.argwhere(binary_mask > 0)
-    coords_physical = coords * np.array(voxel_spacing)
-    if coords_physical.shape[0] < 3:
+    weights = binary_mask > 0
+    n = int(weights.sum())
+    if n < 3:
         return np.array([np.nan] * 3)
-    pca = PCA(n_components=3)
-    pca.fit(coords_physical)
-    return pca.components_[0] / np.linalg.norm(pca.components_[0])
+    # Build the 3x3 covariance from weighted moment sums over the mask itself,
+    # using broadcastable 1D physical coordinate vectors. No (N,3) coordinate
+    # array is ever materialized - argwhere on a large cell costs hundreds of
+    # MB - and the eigendecomposition of the 3x3 matrix is closed-form cheap
+    # compared to a full PCA/SVD of the point cloud.
+    z_um = (np.arange(binary_mask.shape[0]) * voxel_spacing[0]).reshape(-1, 1, 1)
+    y_um = (np.arange(binary_mask.shape[1]) * voxel_spacing[1]).reshape(1, -1, 1)
+    x_um = (np.arange(binary_mask.shape[2]) * voxel_spacing[2]).reshape(1, 1, -1)
+    dz = z_um - (weights * z_um).sum() / n
+    dy = y_um - (weights * y_um).sum() / n
+    dx = x_um - (weights * x_um).sum() / n
+    denom = n - 1
+    czz = (weights * dz * dz).sum() / denom
+    cyy = (weights * dy * dy).sum() / denom
+    cxx = (weights * dx * dx).sum() / denom
+    czy = (weights * dz * dy).sum() / denom
+    czx = (weights * dz * dx).sum() / denom
+    cyx = (weights * dy * dx).sum() / denom
+    cov = np.array([[czz, czy, czx],
+                    [czy, cyy, cyx],
+                    [czx, cyx, cxx]])
+    _, eigvecs = np.linalg.eigh(cov)
+    pc1 = eigvecs[:, -1]  # eigh sorts ascending, so last column is principal
+    # eigh leaves the eigenvector sign arbitrary; fix it deterministically
+    # (largest-magnitude component positive, sklearn's svd_flip convention)
+    # so direction columns stay comparable across runs and versions
+    if pc1[np.argmax(np.abs(pc1))] < 0:
+        pc1 = -pc1
+    return pc1 / np.linalg.norm(pc1)
 
 def compute_organelle_metrics(
     organelle_name: str, segmentation_path: str, csv_path: str,
@@ -72,7 +129,8 @@ def compute_organelle_metrics(
             - Single: 'nucleus', 'pseudopod', 'sperm_cell' (always 1 per cell)
             - Multiple: 'mitochondria', 'MO' (multiple instances per cell)
         segmentation_path: Path to binary mask TIFF (0-255 or 0-1).
-        csv_path: Path to tracking CSV (Frame, X, Y, Track columns) or None.
+        csv_path: Path to tracking file (Frame, X, Y, Track columns) or None.
+                 Either CSV or Feather format (detected by extension).
                  Required for multiple organelles, ignored for single organelles.
         pseudopod_centroid: Reference centroid for pseudopod distance calculations.
         nucleus_centroid: Reference centroid for nucleus distance calculations.
@@ -87,11 +145,11 @@ def compute_organelle_metrics(
             - bounding_box_volume_um3, density, aspect_ratio (shape descriptors)
             - direction_vector components (z, y, x) (orientation for pseudopod only)
     """
-    # --- Load stack ---
-    binary_stack = io.imread(segmentation_path)
+    # --- Load stack (cached - repeated reads of the same file skip decode) ---
     # Use threshold from config - tuning guide:
     # Lower (80-100) = more/smaller objects; Higher (150+) = larger objects only
-    binary_stack = (binary_stack > ORGANELLE_THRESHOLD).astype(np.uint8)
+    binary_stack = _load_mask(
+        segmentation_path, os.path.getmtime(segmentation_path), ORGANELLE_THRESHOLD)
 
     # --- Use config voxel sizes ---
     slice_thickness_um = SLICE_THICKNESS_UM
@@ -102,14 +160,16 @@ def compute_organelle_metrics(
     if organelle_name in ["pseudopod", "nucleus", "sperm_cell"]:
         # SINGLE ORGANELLES: Extract only the largest connected component
         # These structures always appear once per sperm cell
+        # Label once and keep only the largest component - rerunning
+        # measure.label after restamping the stack would cost a second full
+        # connected-components pass
         labeled = measure.label(binary_stack)
         regions = measure.regionprops(labeled)
         if len(regions) > 1:
             largest = max(regions, key=lambda r: r.area)
-            binary_stack[:] = 0
-            coords = tuple(zip(*largest.coords))
-            binary_stack[coords] = 1
-        labels = measure.label(binary_stack)
+            labels = np.where(labeled == largest.label, 1, 0).astype(labeled.dtype)
+        else:
+            labels = labeled
     else:
         # MULTIPLE ORGANELLES: Use watershed segmentation with tracking markers
         # Mitochondria and MO can have multiple instances per cell
@@ -120,32 +180,27 @@ def compute_organelle_metrics(
             #   1. Place marker at each tracked point with its Track ID
             #   2. Run watershed to grow from each seed until hitting black pixels
             #   3. Each organelle gets labeled with its original Track ID
-            df = pd.read_csv(csv_path)
+            # Accept either CSV or Feather (Arrow IPC) tracking files
+            if csv_path.endswith(".feather"):
+                df = pd.read_feather(csv_path)
+            else:
+                df = pd.read_csv(csv_path)
             markers = np.zeros(binary_stack.shape, dtype=np.int32)
             
             # Place markers at tracking coordinates - one unique ID per organelle
-            rows_loaded = 0
-            rows_skipped = 0
-            for _, row in df.iterrows():
-                if (not str(row.get("Frame", "")).strip() or
-                    not str(row.get("X", "")).strip() or
-                    not str(row.get("Y", "")).strip() or
-                    not str(row.get("Track", "")).strip()):
-                    rows_skipped += 1
-                    continue
-                try:
-                    z = int(float(row["Frame"])) - 1  # Frame is 1-indexed from TrackMate, convert to 0-indexed
-                    x = int(float(row["X"]))
-                    y = int(float(row["Y"]))
-                    track = int(float(row["Track"]))  # Unique ID for this organelle instance
-                except ValueError as e:
-                    rows_skipped += 1
-                    continue
-                if 0 <= z < binary_stack.shape[0] and 0 <= y < binary_stack.shape[1] and 0 <= x < binary_stack.shape[2]:
-                    markers[z, y, x] = track
-                    rows_loaded += 1
-                else:
-                    rows_skipped += 1
+            # Coerce whole columns at once (blank/non-numeric cells become NaN)
+            # then place every in-bounds marker with one fancy-indexed assignment
+            numeric = df[["Frame", "X", "Y", "Track"]].apply(pd.to_numeric, errors="coerce").dropna()
+            z = numeric["Frame"].to_numpy().astype(np.int64) - 1  # Frame is 1-indexed from TrackMate, convert to 0-indexed
+            x = numeric["X"].to_numpy().astype(np.int64)
+            y = numeric["Y"].to_numpy().astype(np.int64)
+            track = numeric["Track"].to_numpy().astype(np.int64)  # Unique ID for this organelle instance
+            in_bounds = ((z >= 0) & (z < binary_stack.shape[0]) &
+                         (y >= 0) & (y < binary_stack.shape[1]) &
+                         (x >= 0) & (x < binary_stack.shape[2]))
+            markers[z[in_bounds], y[in_bounds], x[in_bounds]] = track[in_bounds]
+            rows_loaded = int(in_bounds.sum())
+            rows_skipped = len(df) - rows_loaded
             
             if rows_loaded == 0:
                 print(f"Warning: No valid markers placed for {organelle_name} (loaded {rows_loaded}, skipped {rows_skipped})")
@@ -154,8 +209,16 @@ def compute_organelle_metrics(
                 # Watershed algorithm: Groups all white pixels connected to each marker into one organelle
                 # Output labels match input marker IDs (Track IDs from CSV)
                 # This allows us to track individual organelles from frame to frame
-                distance = ndi.distance_transform_edt(binary_stack)
-                labels = segmentation.watershed(-distance, markers, mask=binary_stack)
+                if _USE_GPU:
+                    # EDT parallelizes well on GPU; keep the intermediate
+                    # distance field device-resident and copy back labels only
+                    stack_gpu = cp.asarray(binary_stack)
+                    distance = cundi.distance_transform_edt(stack_gpu)
+                    labels = cp.asnumpy(
+                        cuseg.watershed(-distance, cp.asarray(markers), mask=stack_gpu))
+                else:
+                    distance = ndi.distance_transform_edt(binary_stack)
+                    labels = segmentation.watershed(-distance, markers, mask=binary_stack)
         else:
             # Fallback: No tracking data, use simple connected components
             labels = measure.label(binary_stack)
@@ -166,10 +229,15 @@ def compute_organelle_metrics(
 
     direction_vector = [np.nan] * 3
     if organelle_name == "pseudopod":
+        # labels holds only the largest component for single organelles
         direction_vector = compute_direction_vector(
-            binary_stack, voxel_spacing=(slice_thickness_um, pixel_size_um, pixel_size_um))
+            labels, voxel_spacing=(slice_thickness_um, pixel_size_um, pixel_size_um))
 
     results = []
+    # Bounding-box slice per label, found in one pass - lets marching_cubes
+    # run on a small cropped slab instead of re-scanning the full volume
+    # once per organelle
+    region_slices = ndi.find_objects(labels)
     for region in measure.regionprops(labels):
         track_id = region.label
         volume = region.area * voxel_volume
@@ -186,7 +254,13 @@ def compute_organelle_metrics(
         dims = np.array([depth_um, height_um, width_um])
         aspect_ratio = np.max(dims) / np.min(dims) if np.all(dims > 0) else np.nan
 
-        mask = (labels == track_id)
+        # Expand the bbox by one voxel (clipped to the volume) so the mesh
+        # stays closed exactly as it would on the full volume
+        bbox_slice = tuple(
+            slice(max(s.start - 1, 0), min(s.stop + 1, dim))
+            for s, dim in zip(region_slices[track_id - 1], labels.shape)
+        )
+        mask = (labels[bbox_slice] == track_id)
         try:
             verts, faces, *_ = marching_cubes(mask.astype(np.uint8), level=0.5,
                                               spacing=(slice_thickness_um, pixel_size_um, pixel_size_um))
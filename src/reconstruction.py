@@ -5,66 +5,130 @@ renders animated orbit videos using PyVista.
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import numpy as np
 import imageio
-from scipy.ndimage import gaussian_filter
+from scipy.ndimage import binary_closing as ndi_binary_closing, gaussian_filter, label as ndi_label
 from skimage import io as skio, filters, morphology, measure
 from skimage.util import img_as_bool
 from skimage.measure import marching_cubes
 import pyvista as pv
+import vtk
+from vtk.util.numpy_support import vtk_to_numpy
 from .config import (
     MESH_MIN_SIZE, MESH_THRESHOLD, MESH_BLUR, MESH_CLOSE_RADIUS,
     VIDEO_ZOOM_FACTOR, VIDEO_NUM_FRAMES, VIDEO_FPS
 )
 
+# Optional GPU marching cubes via cupy/cuCIM. Not hard dependencies - without
+# them (or without a CUDA device, or a cuCIM build lacking marching_cubes)
+# meshes are extracted with skimage on the CPU as before.
+try:
+    import cupy as cp
+    from cucim.skimage import measure as cu_measure
+    _GPU_MESH = (hasattr(cu_measure, "marching_cubes")
+                 and cp.cuda.runtime.getDeviceCount() > 0)
+except Exception:
+    _GPU_MESH = False
+
+def _marching_cubes(mask: np.ndarray, spacing: tuple) -> tuple:
+    """Run marching cubes on the GPU when available, else skimage on CPU.
+
+    Args:
+        mask: Binary 3D array to mesh.
+        spacing: Voxel dimensions (z_um, y_um, x_um).
+
+    Returns:
+        Tuple of (vertices, faces) as host numpy arrays.
+    """
+    if _GPU_MESH:
+        verts, faces, *_ = cu_measure.marching_cubes(
+            cp.asarray(mask, dtype=cp.uint8), level=0.5, spacing=spacing)
+        return cp.asnumpy(verts), cp.asnumpy(faces)
+    if mask.dtype == np.bool_:
+        # bool and uint8 share layout, so the view is zero-copy where the
+        # old astype wrote a full second volume
+        mask = mask.view(np.uint8)
+    verts, faces, *_ = marching_cubes(mask, level=0.5, spacing=spacing)
+    return verts, faces
+
 def extract_mesh_inside_sperm(
     path: str, sperm_path: str, voxel_size: tuple, min_sz: int = MESH_MIN_SIZE,
-    thr_m: str = MESH_THRESHOLD, blur_s: float = MESH_BLUR, close_r: int = MESH_CLOSE_RADIUS
+    thr_m: str = MESH_THRESHOLD, blur_s: float = MESH_BLUR, close_r: int = MESH_CLOSE_RADIUS,
+    downsample: int = 1
 ) -> tuple:
     """Extract 3D mesh from organelle stack, restricted to within sperm cell.
     
     Args:
         path: Path to organelle binary mask TIFF.
-        sperm_path: Path to sperm cell boundary mask TIFF.
+        sperm_path: Path to sperm cell boundary mask TIFF, or a preloaded
+                   boolean mask array (lets callers reuse one load across
+                   several organelles).
         voxel_size: Tuple of (z_um, y_um, x_um) voxel dimensions.
         min_sz: Minimum voxels for objects to include.
         thr_m: Thresholding method ('otsu' or numeric threshold).
         blur_s: Gaussian blur sigma (0 = no blur).
         close_r: Morphological closing radius (0 = no closing).
-    
+        downsample: Block-reduce factor applied to the mask before meshing
+                   (1 = full resolution). Cuts triangle count roughly by
+                   downsample**2 for preview/animation use.
+
     Returns:
         Tuple of (vertices, faces) from marching cubes or (None, None) if no objects.
     """
-    organelle = skio.imread(path).astype(np.float32)
-    sperm_mask = skio.imread(sperm_path).astype(np.uint8)
-    sperm_mask = img_as_bool(sperm_mask)
+    organelle = skio.imread(path)
+    if isinstance(sperm_path, np.ndarray):
+        sperm_mask = sperm_path
+    else:
+        sperm_mask = img_as_bool(skio.imread(sperm_path).astype(np.uint8))
 
     if blur_s > 0:
-        organelle = gaussian_filter(organelle, sigma=blur_s)
+        # Only blurring needs float32; in-place separable filter, and
+        # truncate=2.0 halves the kernel radius, which is plenty when the
+        # result is thresholded right after
+        organelle = organelle.astype(np.float32, copy=False)
+        gaussian_filter(organelle, sigma=blur_s, output=organelle,
+                        truncate=2.0, mode='nearest')
 
-    thr = filters.threshold_otsu(organelle) if thr_m == 'otsu' else float(thr_m)
-    binar = organelle > thr
-    binar = morphology.remove_small_objects(binar, min_size=min_sz)
+    if organelle.dtype == np.bool_:
+        binar = organelle  # already binary - nothing to threshold
+    else:
+        # threshold_otsu and the comparison both work on the native integer
+        # dtype, so unblurred stacks never pay for a float32 upcast
+        thr = filters.threshold_otsu(organelle) if thr_m == 'otsu' else float(thr_m)
+        binar = organelle > thr
     if close_r > 0:
-        binar = morphology.binary_closing(binar, footprint=morphology.ball(close_r))
+        # scipy's closing is much faster than skimage's for the same ball
+        binar = ndi_binary_closing(binar, structure=morphology.ball(close_r))
 
     binar &= sperm_mask  # Restrict to within sperm mask
 
-    lbl = measure.label(binar, connectivity=1)
-    props = measure.regionprops(lbl)
-    if not props:
+    # Size-filter components with one bincount pass and a label LUT instead of
+    # remove_small_objects + regionprops + np.isin (three full-volume scans).
+    # ndi_label takes scipy's fast bool path; its default 6-connectivity in 3D
+    # matches the previous connectivity=1
+    lbl, _ = ndi_label(binar)
+    sizes = np.bincount(lbl.ravel())
+    keep_lut = sizes >= min_sz
+    keep_lut[0] = False  # background
+    if not keep_lut.any():
         print(f"Warning: No objects found in {os.path.basename(path)}")
         return None, None
-    keep_labels = [p.label for p in props if p.area >= min_sz]
-    mask = np.isin(lbl, keep_labels)
+    mask = keep_lut[lbl]
 
     spacing = voxel_size
-    verts, faces, *_ = marching_cubes(mask.astype(np.uint8), level=0.5, spacing=spacing)
+    if downsample > 1:
+        # Block-max keeps thin structures present in the coarse mask, and
+        # scaling the spacing keeps the mesh in physical coordinates
+        mask = measure.block_reduce(mask, (downsample,) * 3, np.max)
+        spacing = tuple(s * downsample for s in voxel_size)
+    verts, faces = _marching_cubes(mask, spacing)
     return verts, faces
 
 def extract_mesh(
     path: str, voxel_size: tuple, min_sz: int = MESH_MIN_SIZE,
-    thr_m: str = MESH_THRESHOLD, blur_s: float = MESH_BLUR, close_r: int = MESH_CLOSE_RADIUS
+    thr_m: str = MESH_THRESHOLD, blur_s: float = MESH_BLUR, close_r: int = MESH_CLOSE_RADIUS,
+    downsample: int = 1
 ) -> tuple:
     """Extract 3D mesh from organelle binary stack using marching cubes.
     
@@ -78,35 +142,48 @@ def extract_mesh(
         thr_m: Thresholding method - 'otsu' (auto) or numeric value (e.g., '128').
         blur_s: Gaussian blur sigma for smoothing (0 = no blur).
         close_r: Morphological closing radius for filling holes (0 = no closing).
-    
+        downsample: Block-reduce factor applied to the mask before meshing
+                   (1 = full resolution). Cuts triangle count roughly by
+                   downsample**2 for preview/animation use.
+
     Returns:
         Tuple of (vertices, faces) from marching cubes or (None, None) if no objects.
         vertices: Array of shape (N_verts, 3) with XYZ coordinates in micrometers.
         faces: Array of shape (N_faces, 3) with vertex indices for triangles.
     """
-    stack = skio.imread(path).astype(np.float32)
+    stack = skio.imread(path)
     if blur_s > 0:
-        stack = gaussian_filter(stack, sigma=blur_s)
-    thr = filters.threshold_otsu(stack) if thr_m == 'otsu' else float(thr_m)
-    binar = stack > thr
-    binar = morphology.remove_small_objects(binar, min_size=min_sz)
+        # Same native-dtype handling as extract_mesh_inside_sperm
+        stack = stack.astype(np.float32, copy=False)
+        gaussian_filter(stack, sigma=blur_s, output=stack,
+                        truncate=2.0, mode='nearest')
+    if stack.dtype == np.bool_:
+        binar = stack
+    else:
+        thr = filters.threshold_otsu(stack) if thr_m == 'otsu' else float(thr_m)
+        binar = stack > thr
     if close_r > 0:
-        binar = morphology.binary_closing(binar, footprint=morphology.ball(close_r))
-    lbl = measure.label(binar, connectivity=1)
-    props = measure.regionprops(lbl)
-    if not props:
+        binar = ndi_binary_closing(binar, structure=morphology.ball(close_r))
+    # Same bincount + LUT size filter as extract_mesh_inside_sperm
+    lbl, _ = ndi_label(binar)
+    sizes = np.bincount(lbl.ravel())
+    keep_lut = sizes >= min_sz
+    keep_lut[0] = False  # background
+    if not keep_lut.any():
         print(f"No objects found in {os.path.basename(path)}")
         return None, None
-    keep_labels = [p.label for p in props if p.area >= min_sz]
-    mask = np.isin(lbl, keep_labels)
+    mask = keep_lut[lbl]
     spacing = voxel_size
-    verts, faces, *_ = marching_cubes(mask.astype(np.uint8), level=0.5, spacing=spacing)
+    if downsample > 1:
+        mask = measure.block_reduce(mask, (downsample,) * 3, np.max)
+        spacing = tuple(s * downsample for s in voxel_size)
+    verts, faces = _marching_cubes(mask, spacing)
     return verts, faces
 
 def build_3d_scene(
     objects: list, voxel_size: tuple, min_sz: int = MESH_MIN_SIZE,
     thr_m: str = MESH_THRESHOLD, close_r: int = MESH_CLOSE_RADIUS,
-    sperm_mask_path: str = None
+    sperm_mask_path: str = None, downsample: int = 1
 ) -> pv.Plotter:
     """Build 3D PyVista scene with organelle meshes.
     
@@ -121,7 +198,9 @@ def build_3d_scene(
         thr_m: Thresholding method ('otsu' or numeric).
         close_r: Morphological closing radius.
         sperm_mask_path: Optional path to sperm boundary mask TIFF.
-    
+        downsample: Block-reduce factor passed to the mesh extractors
+                   (1 = full resolution); use 2 for lighter preview meshes.
+
     Returns:
         PyVista Plotter object with all meshes added and ready for rendering.
     """
@@ -129,35 +208,49 @@ def build_3d_scene(
     plotter.set_background('white')
     print("Extracting meshes:")
     mesh_count = 0
-    for o in objects:
-        try:
-            # Try masking for selected organelles, but skip if dimensions don't match
-            if o["name"] in ["mitochondria", "nucleus"] and sperm_mask_path is not None:
-                v, f = extract_mesh_inside_sperm(
-                    o["path"], sperm_mask_path, voxel_size, min_sz, thr_m, o.get("blur", 0.0), close_r
-                )
-            else:
-                # For MO and other organelles, extract without sperm mask
-                # (MO stack may have different dimensions than registered sperm mask)
-                v, f = extract_mesh(
-                    o["path"], voxel_size, min_sz, thr_m, o.get("blur", 0.0), close_r
-                )
-            if v is not None and f is not None:
-                print(f"  {o['name']}: {v.shape[0]} verts, {f.shape[0]} faces")
-                faces_pv = np.hstack([np.full((f.shape[0], 1), 3), f]).astype(np.int64)
-                mesh = pv.PolyData(v, faces_pv)
-                plotter.add_mesh(
-                    mesh,
-                    color=o["color"],
-                    opacity=o["opacity"],
-                    smooth_shading=True,
-                    name=o['name']
-                )
-                mesh_count += 1
-            else:
-                print(f"  ✗ {o['name']}: No mesh extracted")
-        except Exception as e:
-            print(f"  ✗ {o['name']}: Error during extraction - {str(e)[:60]}")
+    # Load the sperm boundary mask once; every masked organelle reuses it
+    # instead of re-reading and re-binarizing the TIFF per organelle
+    sperm_mask = None
+    if sperm_mask_path is not None:
+        sperm_mask = img_as_bool(skio.imread(sperm_mask_path).astype(np.uint8))
+    def _extract(o):
+        # Try masking for selected organelles, but skip if dimensions don't match
+        if o["name"] in ["mitochondria", "nucleus"] and sperm_mask is not None:
+            return extract_mesh_inside_sperm(
+                o["path"], sperm_mask, voxel_size, min_sz, thr_m, o.get("blur", 0.0), close_r,
+                downsample
+            )
+        # For MO and other organelles, extract without sperm mask
+        # (MO stack may have different dimensions than registered sperm mask)
+        return extract_mesh(
+            o["path"], voxel_size, min_sz, thr_m, o.get("blur", 0.0), close_r, downsample
+        )
+
+    # Extract organelles on worker threads - each is dominated by TIFF I/O
+    # and GIL-releasing numpy/scipy work - and add meshes to the plotter on
+    # this thread as the extractions finish
+    with ThreadPoolExecutor(max_workers=min(len(objects), 4) or 1) as pool:
+        futures = {pool.submit(_extract, o): o for o in objects}
+        for future in as_completed(futures):
+            o = futures[future]
+            try:
+                v, f = future.result()
+                if v is not None and f is not None:
+                    print(f"  {o['name']}: {v.shape[0]} verts, {f.shape[0]} faces")
+                    faces_pv = np.hstack([np.full((f.shape[0], 1), 3), f]).astype(np.int64)
+                    mesh = pv.PolyData(v, faces_pv)
+                    plotter.add_mesh(
+                        mesh,
+                        color=o["color"],
+                        opacity=o["opacity"],
+                        smooth_shading=True,
+                        name=o['name']
+                    )
+                    mesh_count += 1
+                else:
+                    print(f"  ✗ {o['name']}: No mesh extracted")
+            except Exception as e:
+                print(f"  ✗ {o['name']}: Error during extraction - {str(e)[:60]}")
     
     if mesh_count == 0:
         print("\nWARNING: No meshes were successfully extracted!")
@@ -187,39 +280,48 @@ def render_orbit_video(
     print(f"🎥 Rendering {num_frames}-frame orbit video...")
     
     try:
-        # Reset camera and set isometric view
+        # Reset camera and set isometric view once; only azimuth changes per frame
         plotter.reset_camera()
         plotter.view_isometric()
         plotter.camera.zoom(zoom_out_factor)
-        
-        frames = []
-        
-        for i in range(num_frames):
-            try:
-                # Calculate rotation angle for full 360° rotation
-                angle = (i / num_frames) * 360.0
-                
-                # Apply isometric view with rotation around Z axis
-                plotter.view_isometric()
-                plotter.camera.azimuth = angle
-                plotter.render()
-                img = plotter.screenshot(return_img=True)
-                frames.append(img)
-                
-                if (i + 1) % 15 == 0:
-                    print(f"  Frame {i + 1}/{num_frames}")
-                    
-            except Exception as e:
-                print(f"Error on frame {i + 1}: {str(e)[:60]}")
-                continue
-        
-        if len(frames) == 0:
+        plotter.render()
+
+        # One vtkWindowToImageFilter reused for every frame - screenshot()
+        # rebuilt the filter and reallocated an image array per call
+        w2if = vtk.vtkWindowToImageFilter()
+        w2if.SetInput(plotter.render_window)
+        w2if.ReadFrontBufferOff()
+
+        # Stream each frame straight into the encoder as it is captured -
+        # accumulating all frames first cost num_frames full images of RAM
+        captured = 0
+        with imageio.get_writer(output_path, fps=fps) as writer:
+            for i in range(num_frames):
+                try:
+                    # Calculate rotation angle for full 360° rotation
+                    angle = (i / num_frames) * 360.0
+                    plotter.camera.azimuth = angle
+                    plotter.render()
+                    w2if.Modified()
+                    w2if.Update()
+                    img_data = w2if.GetOutput()
+                    width, height, _ = img_data.GetDimensions()
+                    # VTK stores rows bottom-up; flip before encoding
+                    frame = vtk_to_numpy(img_data.GetPointData().GetScalars())
+                    writer.append_data(frame.reshape(height, width, -1)[::-1, :, :3])
+                    captured += 1
+
+                    if (i + 1) % 15 == 0:
+                        print(f"  Frame {i + 1}/{num_frames}")
+
+                except Exception as e:
+                    print(f"Error on frame {i + 1}: {str(e)[:60]}")
+                    continue
+
+        if captured == 0:
             raise ValueError("No frames were captured")
-        
-        # Save video
-        print(f"💾 Saving {len(frames)} frames to video...")
-        imageio.mimsave(output_path, frames, fps=fps)
-        print(f"Video saved successfully! ({len(frames)} frames)")
-        
+
+        print(f"Video saved successfully! ({captured} frames)")
+
     except Exception as e:
         raise ValueError(f"Video rendering failed: {str(e)}")
\ No newline at end of file
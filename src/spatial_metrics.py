@@ -6,14 +6,38 @@ All voxel sizes are imported from config.py to ensure consistency.
 
 import os
 import numpy as np
-from skimage import io, measure
+from skimage import io
+from scipy import ndimage as ndi
 from read_roi import read_roi_file
-from sklearn.decomposition import PCA
 import math
 import glob
 
 from .config import PIXEL_SIZE_UM, SLICE_THICKNESS_UM, VOXEL_SIZE
 
+# Voxel size as an array, built once - several functions scale coordinate
+# arrays by it and rebuilding a tiny np.array per call adds up over a run
+_VOXEL = np.asarray(VOXEL_SIZE, dtype=np.float64)
+
+# Numba is optional - with it the tip search below runs as one fused
+# parallel pass; without it the numpy matmul + argmin fallback is used
+try:
+    from numba import njit, prange
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+
+if _HAVE_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _min_proj(coords, direction):
+        """Index of the point with the smallest projection onto direction."""
+        n = coords.shape[0]
+        best = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            best[i] = (coords[i, 0] * direction[0] +
+                       coords[i, 1] * direction[1] +
+                       coords[i, 2] * direction[2])
+        return best.argmin()
+
 def find_roi_file(folder_path: str) -> str:
     """Find and return the path to a single ROI file in a folder.
     
@@ -74,12 +98,18 @@ def get_largest_centroid(path: str) -> np.ndarray:
         ValueError: If mask contains no objects.
     """
     img = io.imread(path)
-    binary = (img > 0).astype(np.uint8)
-    regions = measure.regionprops(measure.label(binary))
-    if not regions:
+    binary = img > 0
+    # Pick the largest component with one bincount over the label image and
+    # take its centroid directly - regionprops built a Python object with
+    # lazy properties for every component just to compare areas
+    # Full 3x3x3 connectivity matches measure.label's default in 3D
+    lbl, num = ndi.label(binary, structure=np.ones((3, 3, 3)))
+    if num == 0:
         raise ValueError("No objects in mask.")
-    largest = max(regions, key=lambda r: r.area)
-    return np.array(largest.centroid)  # (z, y, x)
+    sizes = np.bincount(lbl.ravel())
+    sizes[0] = 0  # background
+    largest = sizes.argmax()
+    return np.array(ndi.center_of_mass(binary, lbl, largest))  # (z, y, x)
 
 def get_direction_vector(mask: np.ndarray) -> tuple:
     """Compute principal direction vector of a 3D pseudopod using PCA.
@@ -102,13 +132,34 @@ def get_direction_vector(mask: np.ndarray) -> tuple:
         - tip_point: The furthest extent of pseudopod along principal direction
         Returns (NaN array, NaN array) if fewer than 3 voxels in mask.
     """
-    coords = np.argwhere(mask > 0)
-    if len(coords) < 3:
+    # np.nonzero gives one array per axis, so each can be scaled by its
+    # scalar voxel size in float32 before the single stack - argwhere plus
+    # a broadcast multiply materialized both an Nx3 int64 and an Nx3
+    # float64 copy of the coordinates
+    zs, ys, xs = np.nonzero(mask)
+    if len(zs) < 3:
         return np.array([np.nan] * 3), np.array([np.nan] * 3)
-    coords_phys = coords * np.array(VOXEL_SIZE)
-    pca = PCA(n_components=3).fit(coords_phys)
-    direction = pca.components_[0]
-    tip = coords_phys[np.argmin(coords_phys @ direction)]  # tip = furthest back projection
+    coords_phys = np.stack([zs.astype(np.float32) * VOXEL_SIZE[0],
+                            ys.astype(np.float32) * VOXEL_SIZE[1],
+                            xs.astype(np.float32) * VOXEL_SIZE[2]], axis=1)
+    # The principal axis is just the top eigenvector of the 3x3 coordinate
+    # covariance - np.linalg.eigh on that tiny matrix replaces sklearn's
+    # PCA fit, which ran a full SVD over all N voxel coordinates with
+    # validation copies on top
+    centered = coords_phys - coords_phys.mean(axis=0)
+    cov = centered.T @ centered
+    _, eigvecs = np.linalg.eigh(cov)  # eigenvalues ascending
+    direction = eigvecs[:, -1]
+    # eigh leaves the sign arbitrary, but the sign decides which end of the
+    # pseudopod the min-projection below picks as the tip; fix it with
+    # sklearn's svd_flip convention (largest-magnitude component positive)
+    # so the tip matches what the old PCA-based code returned
+    if direction[np.argmax(np.abs(direction))] < 0:
+        direction = -direction
+    if _HAVE_NUMBA:
+        tip = coords_phys[_min_proj(coords_phys, direction)]
+    else:
+        tip = coords_phys[np.argmin(coords_phys @ direction)]  # tip = furthest back projection
     return direction, tip
 
 def angle_between_vectors(v1: np.ndarray, v2: np.ndarray) -> float:
@@ -170,7 +221,7 @@ def compute_spatial_metrics(
     direction_vector, tip_phys = get_direction_vector(pseudopod_mask)
 
     # Map pseudopod tip to global coordinates
-    pseudopod_tip = tip_phys / np.array(VOXEL_SIZE)
+    pseudopod_tip = tip_phys / _VOXEL
     pseudopod_tip[1] += offset_y
     pseudopod_tip[2] += offset_x
 
@@ -178,8 +229,8 @@ def compute_spatial_metrics(
     reference_point = np.array(reference_point_xyz)
 
     # Distances
-    dist_centroid = np.linalg.norm((centroid_global - reference_point) * np.array(VOXEL_SIZE))
-    dist_tip = np.linalg.norm((pseudopod_tip - reference_point) * np.array(VOXEL_SIZE))
+    dist_centroid = np.linalg.norm((centroid_global - reference_point) * _VOXEL)
+    dist_tip = np.linalg.norm((pseudopod_tip - reference_point) * _VOXEL)
 
     # Angle between vectors
     vector_to_ref = reference_point - centroid_global
@@ -5,11 +5,11 @@ visualization functions for overlaying tracks on image slices.
 """
 
 import os
-import glob
+import re
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from skimage import io
+import tifffile
 from .config import TRACKING_BLOCK_SIZE, FRAMES_TO_DISPLAY, MIN_TRACKS
 
 def find_input_csv(cell_dir: str, organelle: str, cell_number: int) -> str:
@@ -31,23 +31,15 @@ def find_input_csv(cell_dir: str, organelle: str, cell_number: int) -> str:
     Raises:
         FileNotFoundError: If no matching CSV found.
     """
-    # Try multiple flexible glob patterns
-    patterns = [
-        os.path.join(cell_dir, f"*{organelle}*tracking*{cell_number}*.csv"),
-        os.path.join(cell_dir, f"*tracking*{organelle}*{cell_number}*.csv"),
-        os.path.join(cell_dir, f"*{organelle}*{cell_number}*tracking*.csv"),
-    ]
-    
-    matches = []
-    for pattern in patterns:
-        matches.extend(glob.glob(pattern, recursive=False))
-    
-    # Remove duplicates while preserving order
-    seen = set()
-    matches = [m for m in matches if not (m in seen or seen.add(m))]
-    
-    # Filter to CSV files only
-    matches = [f for f in matches if f.lower().endswith('.csv')]
+    # One directory scan with a lookahead regex replaces three glob passes
+    # (each doing its own listdir + fnmatch); the lookaheads accept the
+    # organelle, 'tracking' and the cell number in any order, and the
+    # case-insensitive flag makes the match live up to the docstring
+    pattern = re.compile(
+        rf'(?i)(?=.*{re.escape(organelle)})(?=.*tracking)(?=.*{cell_number}).*\.csv$'
+    )
+    matches = sorted(entry.path for entry in os.scandir(cell_dir)
+                     if pattern.search(entry.name))
 
     if matches:
         print(f"Found input CSV: {matches[0]}")
@@ -75,23 +67,32 @@ def move_tracks_horizontally(
         label_prefix: Row label prefix to identify block separators.
     """
     df_raw = pd.read_csv(input_csv, header=0)
-    blocks = []
-    current_block_rows = []
-    for _, row in df_raw.iterrows():
-        if isinstance(row['Frame'], str) and row['Frame'].startswith(label_prefix):
-            if current_block_rows:
-                blocks.append(pd.DataFrame(current_block_rows))
-                current_block_rows = []
-            continue
-        if pd.notnull(row['Frame']):
-            current_block_rows.append(row.to_dict())
-    if current_block_rows:
-        blocks.append(pd.DataFrame(current_block_rows))
-    final_df = pd.DataFrame()
+    # Detect block separator rows with one vectorized string test, assign each
+    # row its block number via cumsum, and split with a single groupby - no
+    # per-row iteration and no quadratic concat-in-a-loop copying
+    is_separator = df_raw['Frame'].astype(str).str.startswith(label_prefix)
+    block_id = is_separator.cumsum()
+    keep = ~is_separator & df_raw['Frame'].notna()
+    blocks = [block.reset_index(drop=True)
+              for _, block in df_raw[keep].groupby(block_id[keep], sort=True)]
+    # Split every column name into (prefix, track number) once with a single
+    # vectorized extract; each block then renumbers with one Series add
+    # instead of parsing every column name in Python per block. Matching the
+    # full alphabetic prefix also renumbers Flag columns, which the old
+    # first-character parse silently skipped.
+    renamed = []
+    if blocks:
+        cols = blocks[0].columns
+        parts = cols.str.extract(r'^([A-Za-z]+)(\d+)$')
+        numbered = parts[1].notna().to_numpy()
+        prefixes = parts[0][numbered]
+        numbers = parts[1][numbered].astype(int)
     for i, block_df in enumerate(blocks):
         offset = i * tracks_per_block
-        rename_map = {col: f"{col[0]}{offset + int(col[1:])}" for col in block_df.columns if col[1:].isdigit()}
-        final_df = pd.concat([final_df, block_df.rename(columns=rename_map)], axis=1)
+        new_cols = pd.Series(cols, dtype=object)
+        new_cols[numbered] = (prefixes + (numbers + offset).astype(str)).to_numpy()
+        renamed.append(block_df.set_axis(new_cols, axis=1))
+    final_df = pd.concat(renamed, axis=1) if renamed else pd.DataFrame()
     final_df.to_csv(output_csv, index=False)
 
 # === Convert wide format to long format ===
@@ -107,17 +108,18 @@ def wide_to_long(input_csv: str, output_csv: str, num_tracks: int) -> None:
         num_tracks: Total number of tracks to expect.
     """
     df = pd.read_csv(input_csv)
-    records = []
-    
-    for _, row in df.iterrows():
-        frame = int(float(row['Frame']))
-        for i in range(1, num_tracks + 1):
-            x = row.get(f"X{i}")
-            y = row.get(f"Y{i}")
-            flag = row.get(f"Flag{i}")
-            if pd.notnull(x) and pd.notnull(y):
-                records.append({"Frame": frame, "Track": i, "X": x, "Y": y, "Flag": flag})
-    pd.DataFrame(records).to_csv(output_csv, index=False)
+    df['Frame'] = df['Frame'].astype(float).astype(int)
+
+    # pd.wide_to_long reshapes all X{i}/Y{i}/Flag{i} column groups in one
+    # C-level pass instead of iterating every (row, track) pair in Python.
+    # A row-order key keeps the original frame ordering through the reshape.
+    df['_row'] = np.arange(len(df))
+    long_df = pd.wide_to_long(df, stubnames=['X', 'Y', 'Flag'], i='_row', j='Track')
+    long_df = long_df.reset_index()
+    long_df = long_df[long_df['Track'] <= num_tracks]
+    long_df = long_df.dropna(subset=['X', 'Y'])
+    long_df = long_df.sort_values(['_row', 'Track'])
+    long_df[['Frame', 'Track', 'X', 'Y', 'Flag']].to_csv(output_csv, index=False)
 
 # === Visualization function ===
 def visualize_tracking(
@@ -140,7 +142,6 @@ def visualize_tracking(
     Returns:
         Path to directory containing saved overlays (or None if not saved).
     """
-    stack = io.imread(tiff_path)
     df = pd.read_csv(csv_path)
     
     # Only keep rows with valid Track and Frame
@@ -169,36 +170,41 @@ def visualize_tracking(
         overlay_dir = os.path.join(output_dir, f"{organelle_name}_overlays")
         os.makedirs(overlay_dir, exist_ok=True)
     
-    for frame_num in frames_with_tracks:
-        i = int(frame_num) - 1  # Change to int(frame_num) if your stack is 0-based
-        if i < 0 or i >= stack.shape[0]:
-            continue
-        
-        img = stack[i]
-        
-        fig, ax = plt.subplots(figsize=(8, 8), dpi=100)
-        ax.imshow(img, cmap='gray')
-        
-        frame_df = df[df['Frame'] == frame_num]
-        for _, row in frame_df.iterrows():
-            try:
-                x = float(row['X'])
-                y = float(row['Y'])
-                ax.plot(x, y, 'ro', markersize=5)
-                ax.text(x + 2, y + 2, str(int(row['Track'])), color='red', fontsize=8)
-            except (ValueError, TypeError):
+    # Read only the displayed slices lazily from the TIFF; loading the whole
+    # stack up front cost Z full slices of RAM for frames_to_display of them
+    with tifffile.TiffFile(tiff_path) as tf:
+        n_slices = len(tf.pages)
+        for frame_num in frames_with_tracks:
+            i = int(frame_num) - 1  # Change to int(frame_num) if your stack is 0-based
+            if i < 0 or i >= n_slices:
                 continue
-        
-        ax.set_title(f"Slice {i+1} (Frame {int(frame_num)}, Tracks: {frame_df['Track'].nunique()})", fontsize=12)
-        ax.axis('off')
-        
-        # Save overlay if requested
-        if save_overlays:
-            overlay_path = os.path.join(overlay_dir, f"frame_{int(frame_num):03d}_overlay.png")
-            plt.savefig(overlay_path, bbox_inches='tight', dpi=100)
-        
-        plt.show()
-        plt.close(fig)
+
+            img = tf.pages[i].asarray()
+
+            fig, ax = plt.subplots(figsize=(8, 8), dpi=100)
+            ax.imshow(img, cmap='gray')
+
+            frame_df = df[df['Frame'] == frame_num]
+            # One scatter call for all points on the slice instead of an
+            # ax.plot + ax.text pair per iterrows() row; only the text labels
+            # still need a loop, and it runs over plain numpy values
+            coords = frame_df[['X', 'Y', 'Track']].apply(pd.to_numeric, errors='coerce').dropna()
+            xs = coords['X'].to_numpy()
+            ys = coords['Y'].to_numpy()
+            ax.scatter(xs, ys, s=25, c='red')
+            for x, y, track in zip(xs, ys, coords['Track'].to_numpy()):
+                ax.text(x + 2, y + 2, str(int(track)), color='red', fontsize=8)
+
+            ax.set_title(f"Slice {i+1} (Frame {int(frame_num)}, Tracks: {frame_df['Track'].nunique()})", fontsize=12)
+            ax.axis('off')
+
+            # Save overlay if requested
+            if save_overlays:
+                overlay_path = os.path.join(overlay_dir, f"frame_{int(frame_num):03d}_overlay.png")
+                plt.savefig(overlay_path, bbox_inches='tight', dpi=100)
+
+            plt.show()
+            plt.close(fig)
     
     if save_overlays:
         print(f"Tracking overlays saved to: {overlay_dir}")
@@ -247,7 +253,11 @@ def run_tracking_pipeline(
 
     # 👁️ Visualization (optional)
     if tiff_in and os.path.exists(tiff_in):
-        visualize_tracking(tiff_in, long_csv, frames_to_display=io.imread(tiff_in).shape[0])
+        # Slice count comes from the TIFF metadata - no need to decode the
+        # whole stack just to size the display loop
+        with tifffile.TiffFile(tiff_in) as tf:
+            n_slices = tf.series[0].shape[0]
+        visualize_tracking(tiff_in, long_csv, frames_to_display=n_slices)
 
     return long_csv
 
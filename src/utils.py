@@ -1,14 +1,140 @@
+import functools
 import os
-import glob
+import re
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from skimage import io, measure
-from skimage.transform import resize
+import scipy.ndimage as ndi
+import tifffile
+from skimage import io
+
+# Optional GPU resampling via cupy. Not a hard dependency - without it (or
+# without a CUDA device) downscale_3d runs the scipy path below as before.
+try:
+    import cupy as cp
+    import cupyx.scipy.ndimage as cundi
+    _USE_GPU = cp.cuda.runtime.getDeviceCount() > 0
+except Exception:
+    _USE_GPU = False
+
+# Below this size the host<->device copies cost more than the zoom saves
+_GPU_MIN_BYTES = 32 * 1024 * 1024
+
+# Numba is optional - with it, single-component centroids come from one
+# parallel moment-sum pass; without it scipy's center_of_mass is used
+try:
+    from numba import njit, prange
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+
+if _HAVE_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _mask_centroid(mask):
+        """Centroid of all nonzero voxels via parallel moment sums."""
+        nz, ny, nx = mask.shape
+        count = 0
+        z_sum = 0.0
+        y_sum = 0.0
+        x_sum = 0.0
+        for z in prange(nz):
+            for y in range(ny):
+                for x in range(nx):
+                    if mask[z, y, x]:
+                        count += 1
+                        z_sum += z
+                        y_sum += y
+                        x_sum += x
+        return np.array([z_sum / count, y_sum / count, x_sum / count])
 
 def downscale_3d(arr, scale=0.5):
+    # Singleton axes (e.g. a Z or T of 1 left over from slicing) slow zoom
+    # down sharply and would be collapsed to size 0 by the shape arithmetic
+    # below; resample the squeezed volume and restore the axes afterwards
+    singleton_axes = tuple(i for i, s in enumerate(arr.shape) if s == 1)
+    if singleton_axes:
+        return np.expand_dims(downscale_3d(arr.squeeze(), scale), singleton_axes)
     new_shape = tuple([int(s * scale) for s in arr.shape])
-    arr_down = resize(arr, new_shape, order=1, preserve_range=True, anti_aliasing=True).astype(arr.dtype)
+    # ndi.zoom runs the whole interpolation in C and is far faster than
+    # skimage's resize on 3D volumes; the gaussian pre-blur reproduces
+    # resize's anti-aliasing when downscaling
+    zoom_factors = tuple(new / s for new, s in zip(new_shape, arr.shape))
+
+    # Binary masks (bool, or a strided sample showing only background plus
+    # one value, e.g. {0, 255}) are resampled nearest-neighbour so the
+    # output stays binary - blurring a mask only smears its labels. The
+    # anti-alias blur is also pointless near unity scale, where hardly any
+    # frequencies fold over.
+    sample_vals = np.unique(arr.ravel()[::max(1, arr.size // 1024)])
+    is_mask = arr.dtype == np.bool_ or (sample_vals.size <= 2 and sample_vals[0] == 0)
+    order = 0 if is_mask else 1
+    need_blur = scale < 0.9 and not is_mask
+
+    if _USE_GPU and arr.nbytes > _GPU_MIN_BYTES:
+        work = cp.asarray(arr)
+        if need_blur:
+            sigma = np.maximum(0, (1 / np.asarray(zoom_factors) - 1) / 2)
+            work = cundi.gaussian_filter(work.astype(cp.float32), sigma)
+        out = cundi.zoom(work, zoom_factors, order=order, mode='nearest',
+                         prefilter=False)
+        return cp.asnumpy(out).astype(arr.dtype, copy=False)
+    work = arr
+    if need_blur:
+        sigma = np.maximum(0, (1 / np.asarray(zoom_factors) - 1) / 2)
+        work = ndi.gaussian_filter(arr.astype(np.float32, copy=False), sigma)
+    arr_down = ndi.zoom(work, zoom_factors, order=order, mode='nearest',
+                        prefilter=False).astype(arr.dtype, copy=False)
     return arr_down
 
+@functools.lru_cache(maxsize=64)
+def _list_tiffs(folder: str) -> tuple:
+    """List TIFF names in a folder as (name, lowercased name) pairs, cached.
+
+    get_file_paths probes the same folder several times per sperm; one
+    scandir sweep (no per-file stat calls) serves all of them. Call
+    _list_tiffs.cache_clear() if files are added while a process runs.
+    """
+    with os.scandir(folder) as it:
+        return tuple((e.name, e.name.lower()) for e in it
+                     if e.is_file(follow_symlinks=False)
+                     and e.name.lower().endswith('.tif'))
+
+@functools.lru_cache(maxsize=128)
+def _name_matcher(org_lower: str, sperm_id_str: str):
+    """Compiled test for 'name contains the organelle and the sperm ID'.
+
+    One lookahead regex checks all required substrings in a single C-level
+    pass over the filename instead of chained Python `in` tests; compiled
+    matchers are cached since get_file_paths repeats the same queries.
+    """
+    if org_lower == "sperm cell":
+        # The segmentation mask must contain both words - plain "Sperm 6.tif"
+        # (the raw image) must not match
+        parts = ("sperm", "cell", sperm_id_str)
+    else:
+        parts = (org_lower, sperm_id_str)
+    pattern = "".join(f"(?=.*{re.escape(p)})" for p in parts)
+    return re.compile(pattern).search
+
+def _iter_matches(folder: str, org_lower: str, sperm_id_str: str,
+                  registered: bool, exclude_lower: str):
+    """Yield full paths of TIFFs passing all the flexible-name predicates.
+
+    Streams over the cached folder listing with every predicate inline -
+    the lookahead regex for organelle + sperm ID, the exclusion word and
+    the registration filter - so a caller taking only the first hit does
+    O(position of first match) work and no intermediate lists are built.
+    """
+    matcher = _name_matcher(org_lower, sperm_id_str)
+    for tiff_file, fname_lower in _list_tiffs(folder):
+        if not matcher(fname_lower):
+            continue
+        # Skip files matching exclusion pattern
+        if exclude_lower and exclude_lower in fname_lower:
+            continue
+        # Registration suffix must agree with what was asked for
+        if ("_registration" in fname_lower) == registered:
+            yield os.path.join(folder, tiff_file)
+
 def find_file_by_pattern(folder: str, organelle: str, sperm_id: int, registered: bool = False, exclude_pattern: str = None) -> str:
     """Find organelle TIFF file with flexible naming conventions.
     
@@ -33,63 +159,64 @@ def find_file_by_pattern(folder: str, organelle: str, sperm_id: int, registered:
     Raises:
         FileNotFoundError: If no matching file found.
     """
+    # Fast path: probe the canonical names from docs/FILE_NAMING_GUIDE.md
+    # directly before scanning anything - folders that follow the convention
+    # (the common case) resolve with a couple of stat calls. Canonical names
+    # never contain exclusion words like 'unfused', so exclude_pattern
+    # cannot be violated here.
+    org_token = organelle.replace(" ", "_")
+    suffix = f"_{sperm_id}_registration.tif" if registered else f"_{sperm_id}.tif"
+    for canonical in (f"{org_token}_stack{suffix}", f"{org_token}{suffix}"):
+        path = os.path.join(folder, canonical)
+        if os.path.isfile(path):
+            return path
+
     # Find all TIFF files in folder and match case-insensitively
     if not os.path.isdir(folder):
         raise FileNotFoundError(f"Folder not found: {folder}")
     
-    all_tiffs = [f for f in os.listdir(folder) if f.lower().endswith('.tif')]
-    
-    # Normalize search terms for case-insensitive matching
-    org_lower = organelle.lower()
-    sperm_id_str = str(sperm_id)
+    # Normalize search terms for case-insensitive matching and stream the
+    # flexible match; only the first hit is ever consumed
     exclude_lower = exclude_pattern.lower() if exclude_pattern else None
-    
-    # Find matches: must contain organelle name and sperm_id (case-insensitive)
-    candidates = []
-    for tiff_file in all_tiffs:
-        fname_lower = tiff_file.lower()
-        
-        # Skip files matching exclusion pattern
-        if exclude_lower and exclude_lower in fname_lower:
-            continue
-        
-        # Special case: "sperm cell" = binary segmentation mask
-        # MUST contain both "sperm" AND "cell" together (e.g., "Sperm Cell_stack_6.tif")
-        # Do NOT match just "Sperm 6.tif" (that's the raw image, not the mask)
-        if organelle.lower() == "sperm cell":
-            org_found = "sperm" in fname_lower and "cell" in fname_lower
-        else:
-            # For all other organelles, just check if organelle name is in filename
-            # e.g., "pseudopod" matches "Pseudopod_stack_6.tif"
-            org_found = org_lower in fname_lower
-        
-        # Check if sperm_id is in filename
-        id_found = sperm_id_str in fname_lower
-        
-        if org_found and id_found:
-            candidates.append(tiff_file)
-    
-    # Filter by registration status
-    if registered:
-        # Keep only files with _registration in name
-        matches = [f for f in candidates if "_registration" in f.lower()]
-    else:
-        # Exclude files with _registration in name
-        matches = [f for f in candidates if "_registration" not in f.lower()]
-    
-    if matches:
-        return os.path.join(folder, matches[0])  # Return first match with full path
-    
+    match = next(_iter_matches(folder, organelle.lower(), str(sperm_id),
+                               registered, exclude_lower), None)
+    if match:
+        return match
+
     reg_status = "registered" if registered else "unregistered"
     exclude_msg = f" (excluding '{exclude_pattern}')" if exclude_pattern else ""
     raise FileNotFoundError(
         f"No {reg_status} {organelle} file for sperm {sperm_id} in: {folder}{exclude_msg}\n"
         f"   💡 Expected: organelle name + sperm ID in filename (case-insensitive)\n"
-        f"   💡 Available TIFFs: {sorted([f for f in os.listdir(folder) if f.lower().endswith('.tif')])}"
+        f"   💡 Available TIFFs: {sorted(name for name, _ in _list_tiffs(folder))}"
     )
 
+def _iter_csvs(folder: str):
+    """Yield (path, lowercased name) for every CSV under folder, lazily.
+
+    Depth-first over an explicit stack of scandir iterators, so callers can
+    stop as soon as they find what they want instead of materializing every
+    CSV path in the tree first. Unreadable subfolders are skipped, matching
+    os.walk's default.
+    """
+    stack = [folder]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        name_lower = entry.name.lower()
+                        if name_lower.endswith('.csv'):
+                            yield entry.path, name_lower
+        except OSError:
+            continue
+
+@functools.lru_cache(maxsize=256)
 def find_csv_by_pattern(folder: str, organelle: str, sperm_id: int) -> str:
-    """Find tracking CSV file with flexible naming.
+    """Find tracking CSV file with flexible naming. Results are memoized;
+    see resolve_cache_clear().
     
     Prefers "tracking results" files (primary tracking output).
     Falls back to any file with organelle name + sperm_id.
@@ -102,83 +229,147 @@ def find_csv_by_pattern(folder: str, organelle: str, sperm_id: int) -> str:
     Returns:
         Full path to matching CSV, or None if not found.
     """
-    # Find all CSV files in folder and subfolders
-    all_csvs = []
-    for root, dirs, files in os.walk(folder):
-        for f in files:
-            if f.lower().endswith('.csv'):
-                all_csvs.append(os.path.join(root, f))
-    
     # Normalize search terms for case-insensitive matching
     org_lower = organelle.lower()
     sperm_id_str = str(sperm_id)
-    
-    # First try to find "tracking results" files (primary output)
-    primary_matches = []
-    fallback_matches = []
-    
-    for csv_file in all_csvs:
-        fname_lower = os.path.basename(csv_file).lower()
-        
-        # Check if organelle name and sperm_id are in filename
-        if org_lower in fname_lower and sperm_id_str in fname_lower:
-            # Prefer "tracking results" files
+
+    # Stream CSVs out of the tree, returning the moment a "tracking results"
+    # (primary output) file matches; the first other match is remembered as
+    # the fallback. Nothing is materialized up front.
+    matcher = _name_matcher(org_lower, sperm_id_str)
+    fallback = None
+    for csv_path, fname_lower in _iter_csvs(folder):
+        if matcher(fname_lower):
             if "tracking results" in fname_lower:
-                primary_matches.append(csv_file)
-            else:
-                fallback_matches.append(csv_file)
-    
-    # Return primary match if available, otherwise fallback
-    if primary_matches:
-        return primary_matches[0]
-    elif fallback_matches:
-        return fallback_matches[0]
-    else:
-        return None
+                return csv_path
+            if fallback is None:
+                fallback = csv_path
+    return fallback
+
+# One predicate per organelle key, applied to lowercased filenames. The
+# "registered" entry says whether the _registration suffix follows the
+# caller's registered flag (True) or is always excluded (False, single
+# organelles have no registered versions). MO must skip unfused stacks.
+_ORGANELLE_SPECS = {
+    "pseudopod": {"organelle": "pseudopod", "match": lambda n: "pseudopod" in n,
+                  "registered": False, "exclude": None},
+    "nucleus": {"organelle": "nucleus", "match": lambda n: "nucleus" in n,
+                "registered": False, "exclude": None},
+    "sperm_cell": {"organelle": "sperm cell",
+                   "match": lambda n: "sperm" in n and "cell" in n,
+                   "registered": False, "exclude": None},
+    "MO": {"organelle": "MO", "match": lambda n: "mo" in n,
+           "registered": True, "exclude": "unfused"},
+    "mitochondria": {"organelle": "mitochondria",
+                     "match": lambda n: "mitochondria" in n,
+                     "registered": True, "exclude": None},
+}
+
+def resolve_all_paths(folder: str, sperm_id: int, registered: bool = False) -> dict:
+    """Resolve every organelle TIFF for one sperm with a single folder scan.
+
+    Classifies each filename against all organelle predicates in one pass
+    instead of one find_file_by_pattern scan per organelle.
+
+    Args:
+        folder: Folder containing TIFF files (e.g., '/path/Sperm 16/')
+        sperm_id: Sperm cell ID number
+        registered: If True, finds registered versions of MO/mitochondria.
+
+    Returns:
+        Dictionary mapping organelle keys to full file paths.
+
+    Raises:
+        FileNotFoundError: If any required file not found.
+    """
+    if not os.path.isdir(folder):
+        raise FileNotFoundError(f"Folder not found: {folder}")
+
+    sperm_id_str = str(sperm_id)
+    paths = {}
+    for name, fname_lower in _list_tiffs(folder):
+        if sperm_id_str not in fname_lower:
+            continue
+        is_registered = "_registration" in fname_lower
+        for key, spec in _ORGANELLE_SPECS.items():
+            if key in paths or not spec["match"](fname_lower):
+                continue
+            if spec["exclude"] and spec["exclude"] in fname_lower:
+                continue
+            if is_registered != (registered if spec["registered"] else False):
+                continue
+            paths[key] = os.path.join(folder, name)
+
+    # Missing organelles go back through find_file_by_pattern, which raises
+    # the detailed per-organelle error (cheap - the listing is cached)
+    for key, spec in _ORGANELLE_SPECS.items():
+        if key not in paths:
+            paths[key] = find_file_by_pattern(
+                folder, spec["organelle"], sperm_id,
+                registered=registered if spec["registered"] else False,
+                exclude_pattern=spec["exclude"])
+    return paths
+
+@functools.lru_cache(maxsize=256)
+def _resolve(base_dir: str, sperm_id: int, registered: bool) -> tuple:
+    """Resolve and memoize all paths for one sperm as an items tuple.
+
+    The pipeline asks for the same sperm's paths many times per run; the
+    tuple form is hashable/immutable so one filesystem resolution serves
+    them all. get_file_paths rebuilds a fresh dict per caller.
+    """
+    folder = os.path.join(base_dir, f"Sperm {sperm_id}")
+
+    # The TIFF scan (one pass classifying all five organelles, MO excluding
+    # unfused stacks and single organelles always unregistered) and the two
+    # recursive CSV walks are independent; overlapping them on threads hides
+    # cold-cache directory I/O on slow or networked filesystems
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        tiff_future = pool.submit(resolve_all_paths, folder, sperm_id, registered)
+        mo_future = pool.submit(find_csv_by_pattern, folder, "MO", sperm_id)
+        mito_future = pool.submit(find_csv_by_pattern, folder, "mitochondria", sperm_id)
+        paths = tiff_future.result()
+        mo_csv = mo_future.result()
+        mito_csv = mito_future.result()
+
+    if mo_csv:
+        paths["mo_csv"] = mo_csv
+    if mito_csv:
+        paths["mito_csv"] = mito_csv
+
+    return tuple(paths.items())
 
 def get_file_paths(sperm_id: int, base_dir: str, registered: bool = False):
     """Generate file paths for a sperm cell using flexible naming resolution.
-    
-    Uses glob patterns to find files with flexible naming conventions.
+
     Single organelles (pseudopod, nucleus, sperm_cell) are always unregistered.
     Multiple organelles (MO, mitochondria) can be registered or unregistered.
-    
+    Results are cached per (base_dir, sperm_id, registered); call
+    resolve_cache_clear() if files change while a process runs.
+
     Args:
         sperm_id: Sperm cell ID number
         base_dir: Parent directory containing 'Sperm N' folders
         registered: If True, finds registered versions of MO/mitochondria.
                    If False, finds unregistered versions.
-    
+
     Returns:
         Dictionary with keys for each organelle and corresponding file paths.
-    
+
     Raises:
         FileNotFoundError: If required files not found.
     """
-    folder = os.path.join(base_dir, f"Sperm {sperm_id}")
-    
-    # Single organelles - always unregistered (no registration versions exist)
-    paths = {
-        "pseudopod": find_file_by_pattern(folder, "pseudopod", sperm_id, registered=False),
-        "nucleus": find_file_by_pattern(folder, "nucleus", sperm_id, registered=False),
-        "sperm_cell": find_file_by_pattern(folder, "sperm cell", sperm_id, registered=False),
-        
-        # Multiple organelles - can be registered or unregistered
-        # IMPORTANT: MO search EXCLUDES unfused MO to prevent mismatching
-        "MO": find_file_by_pattern(folder, "MO", sperm_id, registered=registered, exclude_pattern="unfused"),
-        "mitochondria": find_file_by_pattern(folder, "mitochondria", sperm_id, registered=registered),
-    }
-    
-    # Tracking CSVs (optional - return None if not found)
-    mo_csv = find_csv_by_pattern(folder, "MO", sperm_id)
-    mito_csv = find_csv_by_pattern(folder, "mitochondria", sperm_id)
-    
-    if mo_csv:
-        paths["mo_csv"] = mo_csv
-    if mito_csv:
-        paths["mito_csv"] = mito_csv
-    
-    return paths
+    return dict(_resolve(base_dir, sperm_id, bool(registered)))
+
+def resolve_cache_clear() -> None:
+    """Drop every cached path lookup (listings, CSV hits, resolved sperm).
+
+    Call after adding, renaming or deleting files mid-process; tests use it
+    to get a clean slate between cases.
+    """
+    _resolve.cache_clear()
+    find_csv_by_pattern.cache_clear()
+    _list_tiffs.cache_clear()
 
 def get_unfused_mo_path(sperm_id: int, base_dir: str, registered: bool = False) -> str:
     """Get path to unfused MO stack for a sperm cell.
@@ -202,30 +393,23 @@ def get_unfused_mo_path(sperm_id: int, base_dir: str, registered: bool = False)
     if not os.path.isdir(folder):
         raise FileNotFoundError(f"Folder not found: {folder}")
     
-    all_tiffs = [f for f in os.listdir(folder) if f.lower().endswith('.tif')]
+    all_tiffs = _list_tiffs(folder)
     sperm_id_str = str(sperm_id)
-    
-    # Must contain BOTH "unfused" AND "mo" (case-insensitive)
-    candidates = []
-    for tiff_file in all_tiffs:
-        fname_lower = tiff_file.lower()
-        if "unfused" in fname_lower and "mo" in fname_lower and sperm_id_str in fname_lower:
-            candidates.append(tiff_file)
-    
-    # Filter by registration status
-    if registered:
-        matches = [f for f in candidates if "_registration" in f.lower()]
-    else:
-        matches = [f for f in candidates if "_registration" not in f.lower()]
-    
-    if matches:
-        return os.path.join(folder, matches[0])
-    
+
+    # Must contain BOTH "unfused" AND "mo" (case-insensitive); the
+    # registration check runs in the same pass and the first hit wins, so
+    # no intermediate candidate list is built
+    for tiff_file, fname_lower in all_tiffs:
+        if ("unfused" in fname_lower and "mo" in fname_lower
+                and sperm_id_str in fname_lower
+                and ("_registration" in fname_lower) == registered):
+            return os.path.join(folder, tiff_file)
+
     reg_status = "registered" if registered else "unregistered"
     raise FileNotFoundError(
         f"No {reg_status} unfused MO file for sperm {sperm_id} in: {folder}\n"
         f"   💡 Expected filename to contain: 'unfused', 'MO', and '{sperm_id}' (case-insensitive)\n"
-        f"   💡 Available TIFFs: {sorted([f for f in os.listdir(folder) if f.lower().endswith('.tif')])}"
+        f"   💡 Available TIFFs: {sorted(name for name, _ in all_tiffs)}"
     )
 def get_centroid(tif_path: str) -> np.ndarray:
     """Return centroid of the largest component in a binary 3D mask TIFF.
@@ -237,7 +421,35 @@ def get_centroid(tif_path: str) -> np.ndarray:
         Centroid coordinates as (z, y, x) numpy array.
         Returns array of NaNs if no objects found.
     """
-    mask = io.imread(tif_path)
-    mask = (mask > 0).astype(np.uint8)
-    props = measure.regionprops(measure.label(mask))
-    return np.array(props[0].centroid) if props else np.array([np.nan, np.nan, np.nan])
+    # Memory-map the TIFF when the layout allows it so pages are faulted in
+    # on demand instead of decoding the whole volume up front; compressed or
+    # tiled files cannot be mapped and fall back to a normal read
+    try:
+        raw = tifffile.memmap(tif_path, mode='r')
+    except ValueError:
+        raw = io.imread(tif_path)
+    # One bool comparison is the only full-volume temporary; the old
+    # .astype(np.uint8) added a second full copy for nothing - label,
+    # center_of_mass and the numba kernel all take bool directly
+    mask = raw != 0
+    # Label with scipy (full 3x3x3 connectivity matches measure.label's 3D
+    # default), pick the biggest component with one bincount, and read its
+    # centroid straight from center_of_mass - regionprops allocated a
+    # Python object per component. This also makes the docstring true:
+    # the old code returned the first component, not the largest.
+    # Labeling into a preallocated int32 buffer halves the bandwidth of the
+    # default int64 output - these masks never get near 2**31 components
+    lbl = np.empty(mask.shape, dtype=np.int32)
+    num = ndi.label(mask, structure=np.ones((3, 3, 3)), output=lbl)
+    if num == 0:
+        return np.array([np.nan, np.nan, np.nan])
+    if num == 1:
+        # Single blob (the usual case for clean masks): its centroid is the
+        # whole-mask centroid, so skip the per-label machinery entirely
+        if _HAVE_NUMBA:
+            return _mask_centroid(mask)
+        return np.array(ndi.center_of_mass(mask))
+    sizes = np.bincount(lbl.ravel())
+    sizes[0] = 0  # background
+    largest = int(sizes.argmax())
+    return np.array(ndi.center_of_mass(mask, lbl, largest))
@@ -0,0 +1,35 @@
+"""Tests for direction/tip extraction in src.spatial_metrics."""
+
+import numpy as np
+
+from src.config import VOXEL_SIZE
+from src.spatial_metrics import get_direction_vector
+
+
+def test_direction_sign_and_tip_on_asymmetric_mask():
+    """The deterministic sign convention picks the low-Y end as the tip.
+
+    The mask is a pseudopod along Y that tapers to a single voxel at its
+    low-Y end, so the tip is unambiguous. With the largest-magnitude
+    component of the direction forced positive (sklearn's svd_flip
+    convention), the minimum projection must land on that voxel.
+    """
+    mask = np.zeros((20, 64, 64), dtype=np.uint8)
+    # Thick body for y in [12, 50), single-voxel spike down to y = 5
+    mask[9:12, 12:50, 31:34] = 255
+    mask[10, 5:12, 32] = 255
+
+    direction, tip = get_direction_vector(mask)
+
+    # Principal axis is Y; its component must come out positive
+    assert abs(direction[1]) == max(abs(c) for c in direction)
+    assert direction[1] > 0
+
+    expected_tip = np.array([10, 5, 32]) * np.array(VOXEL_SIZE)
+    np.testing.assert_allclose(tip, expected_tip, atol=1e-6)
+
+
+def test_direction_for_tiny_mask_is_nan():
+    direction, tip = get_direction_vector(np.zeros((3, 3, 3), dtype=bool))
+    assert np.isnan(direction).all()
+    assert np.isnan(tip).all()